@@ -1,11 +1,164 @@
-from django.contrib import admin
-from .models import Friendship
-
-admin.site.register(Friendship)
-
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .helper import EstimatedCountPaginator
+from .models import BackgroundJob, Block, Friendship, FriendshipChange
+from .versions import bump_versions_for
+
+
+@admin.register(Friendship)
+class FriendshipAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "from_user",
+        "to_user",
+        "friend_status",
+        "request_status",
+        "reject_status",
+    )
+    # __str__ and the user columns read from_user/to_user, join them up front
+    list_select_related = ("from_user", "to_user")
+    list_filter = ("friend_status", "request_status", "reject_status")
+    # Avoid <select> widgets that load every user into the change form
+    raw_id_fields = ("from_user", "to_user")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["accept_requests", "reject_requests", "reset_to_pending"]
+
+    @staticmethod
+    def selected(queryset):
+        # The changelist queryset carries the active list filter, which the
+        # first update() may stop matching; pin the selection by pk instead
+        pks = list(queryset.values_list("pk", flat=True))
+        return Friendship.objects.filter(pk__in=pks)
+
+    @admin.action(description="Accept selected friend requests")
+    @transaction.atomic
+    def accept_requests(self, request, queryset):
+        queryset = self.selected(queryset)
+        now = timezone.now()
+        updated = queryset.filter(friend_status=False).update(
+            friend_status=True,
+            request_status=False,
+            reject_status=False,
+            updated_at=now,
+        )
+
+        # Mirror rows that already exist are flipped in one UPDATE ...
+        Friendship.objects.filter(
+            Exists(
+                queryset.filter(
+                    from_user=OuterRef("to_user"), to_user=OuterRef("from_user")
+                )
+            )
+        ).update(
+            friend_status=True,
+            request_status=False,
+            reject_status=False,
+            updated_at=now,
+        )
+
+        # ... and missing ones are inserted in batches.
+        batch = []
+        changes = []
+        for from_user_id, to_user_id in queryset.values_list(
+            "from_user_id", "to_user_id"
+        ).iterator():
+            batch.append(
+                Friendship(
+                    from_user_id=to_user_id,
+                    to_user_id=from_user_id,
+                    friend_status=True,
+                    request_status=False,
+                    reject_status=False,
+                )
+            )
+            changes += [
+                FriendshipChange(
+                    from_user_id=from_user_id, to_user_id=to_user_id, added=True
+                ),
+                FriendshipChange(
+                    from_user_id=to_user_id, to_user_id=from_user_id, added=True
+                ),
+            ]
+            if len(batch) >= 1000:
+                Friendship.objects.bulk_create(batch, ignore_conflicts=True)
+                FriendshipChange.objects.bulk_create(changes)
+                batch = []
+                changes = []
+        if batch:
+            Friendship.objects.bulk_create(batch, ignore_conflicts=True)
+            FriendshipChange.objects.bulk_create(changes)
+
+        # update() and bulk_create() skip the signals that bump versions and
+        # log friend graph changes
+        bump_versions_for(queryset)
+        self.message_user(request, f"{updated} friend request(s) accepted.")
+
+    @admin.action(description="Reject selected friend requests")
+    @transaction.atomic
+    def reject_requests(self, request, queryset):
+        queryset = self.selected(queryset)
+        updated = queryset.filter(friend_status=False).update(
+            request_status=False, reject_status=True, updated_at=timezone.now()
+        )
+        # update() and bulk_create() skip the signals that bump versions
+        bump_versions_for(queryset)
+        self.message_user(request, f"{updated} friend request(s) rejected.")
+
+    @admin.action(description="Reset selected requests to pending")
+    @transaction.atomic
+    def reset_to_pending(self, request, queryset):
+        queryset = self.selected(queryset)
+        updated = queryset.filter(friend_status=False).update(
+            request_status=True, reject_status=False, updated_at=timezone.now()
+        )
+        # update() and bulk_create() skip the signals that bump versions
+        bump_versions_for(queryset)
+        self.message_user(request, f"{updated} friend request(s) reset to pending.")
+
+
+@admin.register(Block)
+class BlockAdmin(admin.ModelAdmin):
+    list_display = ("id", "blocker", "blocked")
+    list_select_related = ("blocker", "blocked")
+    raw_id_fields = ("blocker", "blocked")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "task",
+        "status",
+        "processed",
+        "chunks",
+        "attempts",
+        "worker",
+        "created_at",
+        "heartbeat_at",
+        "finished_at",
+    )
+    list_filter = ("status", "task")
+    readonly_fields = (
+        "checkpoint",
+        "processed",
+        "chunks",
+        "error",
+        "attempts",
+        "run_after",
+        "worker",
+        "started_at",
+        "heartbeat_at",
+        "finished_at",
+    )
+
 
 # Extend the existing UserAdmin class
 class UserAdmin(BaseUserAdmin):
@@ -16,4 +169,4 @@ class UserAdmin(BaseUserAdmin):
 admin.site.unregister(User)
 
 # Register the new UserAdmin
-admin.site.register(User, UserAdmin)
\ No newline at end of file
+admin.site.register(User, UserAdmin)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from .tokens import verify_token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates "Authorization: Token <signed token>" headers issued by
+    connection.tokens. Legacy rest_framework.authtoken keys are left for
+    ExpiringTokenAuthentication further down the list.
+
+    The returned user only has its id loaded; other fields are fetched from
+    the database the first time they are read.
+    """
+
+    keyword = "Token"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            return None
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            return None
+        if ":" not in key:
+            return None
+
+        user_id = verify_token(key)
+        if user_id is None:
+            raise exceptions.AuthenticationFailed("Invalid or expired token.")
+        return (User.from_db(DEFAULT_DB_ALIAS, ["id"], [user_id]), key)
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """
+    rest_framework.authtoken keys minted before signed tokens existed. They
+    stop working AUTH_TOKEN_LIFETIME seconds after `Token.created` and are
+    deleted on first use past that point.
+    """
+
+    def authenticate_credentials(self, key):
+        user, token = super().authenticate_credentials(key)
+        lifetime = timedelta(seconds=settings.AUTH_TOKEN_LIFETIME)
+        if token.created + lifetime <= timezone.now():
+            token.delete()
+            raise exceptions.AuthenticationFailed("Invalid or expired token.")
+        return (user, token)
@@ -0,0 +1,92 @@
+import hashlib
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def make_key(prefix, *parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+def coalesce(key, compute, ttl):
+    """
+    Return compute() for `key`, sharing the work between callers.
+
+    Results stay in the cache for `ttl` seconds. Near expiry a caller may
+    recompute early with probability growing as expiry approaches (XFetch),
+    so refreshes are spread out instead of stampeding at once. Concurrent
+    callers in this process wait for a single in-flight computation, and a
+    cache lock lets only one process recompute while others keep serving
+    the previous value.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expiry = entry
+        jitter = delta * settings.COALESCE_BETA * math.log(1.0 - random.random())
+        if time.time() - jitter < expiry:
+            return value
+
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = _refresh(key, compute, ttl, entry)
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+    return flight.value
+
+
+def _refresh(key, compute, ttl, entry):
+    lock_key = f"{key}:lock"
+    locked = cache.add(lock_key, 1, settings.COALESCE_LOCK_TIMEOUT)
+    if not locked:
+        # Another process is computing: serve what we have, or wait for it.
+        if entry is not None:
+            return entry[0]
+        deadline = time.monotonic() + settings.COALESCE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+
+    try:
+        start = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - start
+        # Kept past its logical expiry so it can be served while refreshing.
+        cache.set(key, (value, delta, time.time() + ttl), ttl * 2)
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
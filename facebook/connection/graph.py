@@ -0,0 +1,251 @@
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .models import Friendship, FriendshipChange
+
+logger = logging.getLogger("django")
+
+
+class GraphTimeout(Exception):
+    pass
+
+
+class GraphNotReady(Exception):
+    pass
+
+
+class FriendGraph:
+    """
+    Read-only CSR snapshot of accepted friendships plus a small overlay of
+    edges added or removed since it was loaded.
+
+    `nodes` holds the sorted user ids that have friends, and the friends of
+    nodes[i] are neighbors[offsets[i]:offsets[i + 1]]. Overlay sets are
+    frozensets replaced on every change, so searches running in other
+    threads never see one mid-update.
+    """
+
+    def __init__(self, nodes, offsets, neighbors):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.added = {}
+        self.removed = {}
+        # (from id, to id) -> id of the last FriendshipChange applied
+        self.changes = {}
+        # FriendshipChange rows created at or after `cursor` are replayed
+        self.cursor = None
+        self.loaded_at = self.polled_at = time.monotonic()
+
+    @classmethod
+    def from_edges(cls, edges):
+        """Build from (from_user_id, to_user_id) pairs sorted by from_user_id."""
+        nodes = array("q")
+        offsets = array("q", [0])
+        neighbors = array("q")
+        for from_id, to_id in edges:
+            if not nodes or nodes[-1] != from_id:
+                if nodes:
+                    offsets.append(len(neighbors))
+                nodes.append(from_id)
+            neighbors.append(to_id)
+        if nodes:
+            offsets.append(len(neighbors))
+        return cls(nodes, offsets, neighbors)
+
+    @classmethod
+    def load(cls, chunk_size=20000):
+        edges = (
+            Friendship.objects.filter(friend_status=True)
+            .order_by("from_user_id", "to_user_id")
+            .values_list("from_user_id", "to_user_id")
+            .iterator(chunk_size=chunk_size)
+        )
+        return cls.from_edges(edges)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add_edge(self, from_id, to_id):
+        self.removed[from_id] = self.removed.get(from_id, frozenset()) - {to_id}
+        self.added[from_id] = self.added.get(from_id, frozenset()) | {to_id}
+
+    def remove_edge(self, from_id, to_id):
+        self.added[from_id] = self.added.get(from_id, frozenset()) - {to_id}
+        self.removed[from_id] = self.removed.get(from_id, frozenset()) | {to_id}
+
+    def apply_change(self, change_id, from_id, to_id, added):
+        """
+        Apply a FriendshipChange row. Rows may be seen more than once or out
+        of order; only the newest change of each edge takes effect.
+        """
+        if self.changes.get((from_id, to_id), 0) >= change_id:
+            return
+        self.changes[(from_id, to_id)] = change_id
+        if added:
+            self.add_edge(from_id, to_id)
+        else:
+            self.remove_edge(from_id, to_id)
+
+    def friends_of(self, user_id):
+        index = bisect_left(self.nodes, user_id)
+        if index < len(self.nodes) and self.nodes[index] == user_id:
+            base = self.neighbors[self.offsets[index] : self.offsets[index + 1]]
+        else:
+            base = ()
+        removed = self.removed.get(user_id)
+        if removed:
+            base = [friend for friend in base if friend not in removed]
+        added = self.added.get(user_id)
+        if added:
+            return list(base) + list(added)
+        return base
+
+    def shortest_path(self, source, target, max_depth, time_budget, excluded=()):
+        """
+        Bidirectional BFS from both ends, always expanding the smaller
+        frontier. Returns the list of user ids from source to target, or
+        None when they are not connected within `max_depth` hops without
+        passing through a user in `excluded`. Raises GraphTimeout once
+        `time_budget` seconds have passed.
+        """
+        if source == target:
+            return [source]
+        if target in excluded:
+            return None
+        deadline = time.monotonic() + time_budget
+        parents_source = {source: None}
+        parents_target = {target: None}
+        frontier_source = [source]
+        frontier_target = [target]
+
+        for _ in range(max_depth):
+            if not frontier_source or not frontier_target:
+                return None
+            if len(frontier_source) <= len(frontier_target):
+                frontier_source, meet = self._expand(
+                    frontier_source, parents_source, parents_target, deadline, excluded
+                )
+            else:
+                frontier_target, meet = self._expand(
+                    frontier_target, parents_target, parents_source, deadline, excluded
+                )
+            if meet is not None:
+                path = []
+                node = meet
+                while node is not None:
+                    path.append(node)
+                    node = parents_source[node]
+                path.reverse()
+                node = parents_target[meet]
+                while node is not None:
+                    path.append(node)
+                    node = parents_target[node]
+                return path
+        return None
+
+    def _expand(self, frontier, parents, other_parents, deadline, excluded):
+        next_frontier = []
+        for count, node in enumerate(frontier):
+            if not count % 1024 and time.monotonic() > deadline:
+                raise GraphTimeout
+            for friend in self.friends_of(node):
+                if friend in parents or friend in excluded:
+                    continue
+                parents[friend] = node
+                if friend in other_parents:
+                    return next_frontier, friend
+                next_frontier.append(friend)
+        return next_frontier, None
+
+
+class GraphHolder:
+    """
+    Process-wide FriendGraph. The snapshot is built in a background thread,
+    started by the first request (or at boot with FRIEND_GRAPH_PRELOAD), and
+    get() raises GraphNotReady until it is in place.
+
+    Every FRIEND_GRAPH_POLL_INTERVAL seconds one request replays the
+    FriendshipChange rows written since the last poll, by any process, onto
+    the overlay. A snapshot older than FRIEND_GRAPH_MAX_AGE is rebuilt in
+    the background to fold the overlay back into the arrays.
+    """
+
+    def __init__(self):
+        self.graph = None
+        self.lock = threading.Lock()
+        self.poll_lock = threading.Lock()
+        # Pid of the process whose thread is loading; a forked child sees
+        # its parent's pid and starts its own load
+        self.loading_pid = None
+
+    def get(self):
+        graph = self.graph
+        if graph is None:
+            self.start()
+            raise GraphNotReady
+        if time.monotonic() - graph.loaded_at > settings.FRIEND_GRAPH_MAX_AGE:
+            self.start()
+        if time.monotonic() - graph.polled_at > settings.FRIEND_GRAPH_POLL_INTERVAL:
+            # One request polls at a time; the rest keep using the graph
+            if self.poll_lock.acquire(blocking=False):
+                try:
+                    self.catch_up(self.graph)
+                finally:
+                    self.poll_lock.release()
+        return self.graph
+
+    def start(self):
+        with self.lock:
+            if self.loading_pid == os.getpid():
+                return
+            self.loading_pid = os.getpid()
+        threading.Thread(target=self._load_in_background, daemon=True).start()
+
+    def load(self):
+        """Build a new snapshot, bring it up to date and install it."""
+        started = timezone.now()
+        graph = FriendGraph.load()
+        graph.cursor = started - timedelta(seconds=settings.FRIEND_GRAPH_CHANGE_LAG)
+        with self.poll_lock:
+            self.catch_up(graph)
+            self.graph = graph
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Failed to load the friend graph.")
+        finally:
+            with self.lock:
+                self.loading_pid = None
+            connections.close_all()
+
+    def catch_up(self, graph):
+        """
+        Replay FriendshipChange rows created since the graph's cursor. The
+        cursor trails the poll by FRIEND_GRAPH_CHANGE_LAG seconds so rows
+        from transactions that commit late are still picked up.
+        """
+        polled = timezone.now()
+        changes = (
+            FriendshipChange.objects.filter(created_at__gte=graph.cursor)
+            .order_by("id")
+            .values_list("id", "from_user_id", "to_user_id", "added")
+        )
+        for change in changes.iterator():
+            graph.apply_change(*change)
+        graph.cursor = polled - timedelta(seconds=settings.FRIEND_GRAPH_CHANGE_LAG)
+        graph.polled_at = time.monotonic()
+
+
+friend_graph = GraphHolder()
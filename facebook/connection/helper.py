@@ -1,3 +1,6 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework.throttling import SimpleRateThrottle
 
 class FriendRequestRateThrottle(SimpleRateThrottle):
@@ -22,4 +25,46 @@ def helper_response(success, data, code, message):
         "message": message,
         "data": data,
     }
-    return response
\ No newline at end of file
+    return response
+
+
+def estimated_row_count(model, using="default"):
+    """
+    Row count of the model's table from the planner statistics, or 0 when
+    the database backend does not expose one.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+    else:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    return max(row[0] or 0, 0) if row else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that skips the exact COUNT(*) on unfiltered querysets whose
+    estimated size is above `estimate_threshold`.
+    """
+
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(
+                self.object_list.model, using=self.object_list.db
+            )
+            if estimate > self.estimate_threshold:
+                return estimate
+        return super().count
@@ -0,0 +1,156 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger("django")
+
+registry = {}
+
+
+class JobLost(Exception):
+    """The job was handed to another worker while this one ran it."""
+
+
+def register(cls):
+    registry[cls.name] = cls
+    return cls
+
+
+def get_registry():
+    # connection.tasks registers itself on import; loading it here keeps it
+    # out of web worker startup.
+    from . import tasks  # noqa: F401
+
+    return registry
+
+
+class ChunkedTask:
+    """
+    Base class for background tasks. A task processes its rows in bounded
+    chunks; run_chunk() must be idempotent and return the number of rows it
+    handled and the checkpoint to resume from, or None once finished.
+    """
+
+    name = None
+    chunk_size = 1000
+
+    def __init__(self, params):
+        self.params = params
+
+    def run_chunk(self, checkpoint, chunk_size):
+        raise NotImplementedError
+
+
+def enqueue(task, **params):
+    if task not in get_registry():
+        raise ValueError(f"Unknown task: {task}")
+    return BackgroundJob.objects.create(task=task, params=params)
+
+
+def claim_job(worker):
+    """
+    Atomically take the oldest queued job that is due, or a running one
+    whose worker stopped sending heartbeats. Returns None when there is
+    nothing to do.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_HEARTBEAT_TIMEOUT)
+    claimable = Q(
+        Q(run_after__isnull=True) | Q(run_after__lte=now),
+        status=BackgroundJob.QUEUED,
+    ) | Q(status=BackgroundJob.RUNNING, heartbeat_at__lt=stale)
+    for pk in BackgroundJob.objects.filter(claimable).order_by("id").values_list(
+        "pk", flat=True
+    )[:10]:
+        now = timezone.now()
+        claimed = BackgroundJob.objects.filter(claimable, pk=pk).update(
+            status=BackgroundJob.RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job, stop_event=None):
+    """
+    Run `job` chunk by chunk, committing the checkpoint with each chunk.
+    When `stop_event` is set the job goes back to the queue at its last
+    checkpoint. A failed run is retried with exponential backoff until
+    JOB_MAX_ATTEMPTS runs have failed.
+    """
+    task = get_registry()[job.task](job.params)
+    chunk_size = job.params.get("chunk_size", task.chunk_size)
+    checkpoint = job.checkpoint
+    started = time.monotonic()
+    processed_this_run = 0
+    # Every write is conditional on this worker still owning the job, so a
+    # worker that lost it after a stale heartbeat cannot clobber the new
+    # owner's progress
+    owned = BackgroundJob.objects.filter(
+        pk=job.pk, worker=job.worker, status=BackgroundJob.RUNNING
+    )
+
+    try:
+        while checkpoint is not None:
+            if stop_event is not None and stop_event.is_set():
+                owned.update(status=BackgroundJob.QUEUED, worker="")
+                logger.info(f"Job {job} released at checkpoint {job.checkpoint}")
+                return
+            with transaction.atomic():
+                processed, checkpoint = task.run_chunk(checkpoint, chunk_size)
+                now = timezone.now()
+                fields = {
+                    "processed": F("processed") + processed,
+                    "chunks": F("chunks") + 1,
+                    "checkpoint": checkpoint or {},
+                    "heartbeat_at": now,
+                }
+                if checkpoint is None:
+                    fields.update(status=BackgroundJob.DONE, finished_at=now)
+                if not owned.update(**fields):
+                    # Roll the chunk back along with the checkpoint
+                    raise JobLost
+            job.processed += processed
+            job.chunks += 1
+            job.checkpoint = checkpoint or {}
+            processed_this_run += processed
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Job {job}: chunk {job.chunks}, {job.processed} processed, "
+                f"{processed_this_run / elapsed if elapsed else 0:.0f} rows/s"
+            )
+            if checkpoint is not None and settings.JOB_CHUNK_PAUSE:
+                time.sleep(settings.JOB_CHUNK_PAUSE)
+    except JobLost:
+        logger.warning(f"Job {job} was taken over by another worker")
+    except Exception as exc:
+        attempts = job.attempts + 1
+        now = timezone.now()
+        if attempts >= settings.JOB_MAX_ATTEMPTS:
+            logger.exception(f"Job {job} failed after {attempts} attempts")
+            owned.update(
+                status=BackgroundJob.FAILED,
+                attempts=attempts,
+                error=repr(exc),
+                finished_at=now,
+            )
+        else:
+            delay = settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1)
+            logger.exception(f"Job {job} failed, retrying in {delay} s")
+            owned.update(
+                status=BackgroundJob.QUEUED,
+                attempts=attempts,
+                error=repr(exc),
+                worker="",
+                run_after=now + timedelta(seconds=delay),
+            )
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from connection.authentication import SignedTokenAuthentication
+from connection.tokens import issue_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request authentication cost of signed tokens against "
+        "rest_framework.authtoken. Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user("bench-auth-user")
+            cases = [
+                ("authtoken", TokenAuthentication(), Token.objects.create(user=user).key),
+                ("signed", SignedTokenAuthentication(), issue_token(user)),
+            ]
+            for label, authenticator, key in cases:
+                timings, queries = self.bench(
+                    authenticator, key, options["requests"], options["rounds"]
+                )
+                self.stdout.write(
+                    f"{label:<10} median {statistics.median(timings):7.2f} us/request"
+                    f"   min {min(timings):7.2f} us/request"
+                    f"   {queries:.2f} queries/request"
+                )
+            transaction.set_rollback(True)
+
+    def bench(self, authenticator, key, requests, rounds):
+        factory = RequestFactory()
+        timings = []
+        with CaptureQueriesContext(connection) as captured:
+            for _ in range(rounds):
+                elapsed = 0.0
+                for _ in range(requests):
+                    request = factory.get("/", HTTP_AUTHORIZATION=f"Token {key}")
+                    start = time.perf_counter()
+                    authenticator.authenticate(request)
+                    elapsed += time.perf_counter() - start
+                timings.append(elapsed / requests * 1e6)
+        return timings, len(captured) / (requests * rounds)
@@ -0,0 +1,102 @@
+import random
+from array import array
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from connection.graph import FriendGraph, GraphTimeout
+
+
+def synthetic_edges(nodes, ring, shortcuts, rng):
+    """
+    Symmetric small-world graph: every user is friends with its `ring`
+    nearest ids on each side plus, for each of `shortcuts` random
+    permutations p, the users p[i] and p^-1[i]. Yields edges sorted by
+    from id.
+    """
+    permutations = []
+    for _ in range(shortcuts):
+        order = list(range(nodes))
+        rng.shuffle(order)
+        forward = array("q", order)
+        inverse = array("q", bytes(8 * nodes))
+        for index, value in enumerate(forward):
+            inverse[value] = index
+        permutations += [forward, inverse]
+    for node in range(nodes):
+        friends = {(node + step) % nodes for step in range(1, ring + 1)}
+        friends |= {(node - step) % nodes for step in range(1, ring + 1)}
+        friends |= {permutation[node] for permutation in permutations}
+        friends.discard(node)
+        for friend in sorted(friends):
+            yield node, friend
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic friend graph in memory and time degrees-of-"
+        "separation queries between random users."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nodes", type=int, default=2000000)
+        parser.add_argument(
+            "--ring", type=int, default=4, help="Ring neighbours on each side."
+        )
+        parser.add_argument(
+            "--shortcuts",
+            type=int,
+            default=3,
+            help="Random permutations adding two long-range friends each.",
+        )
+        parser.add_argument("--queries", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        start = time.perf_counter()
+        graph = FriendGraph.from_edges(
+            synthetic_edges(
+                options["nodes"], options["ring"], options["shortcuts"], rng
+            )
+        )
+        self.stdout.write(
+            f"built {len(graph)} users / {len(graph.neighbors)} edges "
+            f"in {time.perf_counter() - start:.1f} s"
+        )
+
+        timings, degrees, timeouts, misses = [], [], 0, 0
+        for _ in range(options["queries"]):
+            source = rng.randrange(options["nodes"])
+            target = rng.randrange(options["nodes"])
+            start = time.perf_counter()
+            try:
+                path = graph.shortest_path(
+                    source,
+                    target,
+                    settings.FRIEND_GRAPH_MAX_DEPTH,
+                    settings.FRIEND_GRAPH_TIME_BUDGET,
+                )
+            except GraphTimeout:
+                timeouts += 1
+                path = None
+            timings.append((time.perf_counter() - start) * 1000)
+            if path is None:
+                misses += 1
+            else:
+                degrees.append(len(path) - 1)
+
+        timings.sort()
+        self.stdout.write(
+            f"latency  median {statistics.median(timings):.2f} ms"
+            f"   p99 {timings[int(len(timings) * 0.99) - 1]:.2f} ms"
+            f"   max {timings[-1]:.2f} ms"
+        )
+        if degrees:
+            self.stdout.write(f"degree   mean {statistics.mean(degrees):.2f}")
+        self.stdout.write(
+            f"not connected within {settings.FRIEND_GRAPH_MAX_DEPTH}: {misses - timeouts}"
+            f"   timeouts: {timeouts}"
+        )
@@ -0,0 +1,102 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.urls import path
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+# The stack that ran for every request before StatelessPathMiddleware.
+LEGACY_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+
+class BenchAuthentication(BaseAuthentication):
+    # Authenticates without a database hit so only the middleware is measured.
+    user = User(id=1, username="bench")
+
+    def authenticate(self, request):
+        return (self.user, None)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([BenchAuthentication])
+def empty_view(request):
+    return Response({})
+
+
+urlpatterns = [
+    path("bench/", empty_view),
+    path(settings.STATELESS_PATH_PREFIXES[0].strip("/") + "/bench/", empty_view),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request middleware overhead with an empty authenticated "
+        "view, comparing the legacy stack against StatelessPathMiddleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20000)
+        parser.add_argument("--rounds", type=int, default=5)
+
+    def handle(self, *args, **options):
+        stateless_path = settings.STATELESS_PATH_PREFIXES[0] + "bench/"
+        cases = [
+            ("legacy stack", LEGACY_MIDDLEWARE, stateless_path),
+            ("stateless path", settings.MIDDLEWARE, stateless_path),
+            ("session path", settings.MIDDLEWARE, "/bench/"),
+        ]
+        for label, middleware, url in cases:
+            with override_settings(
+                MIDDLEWARE=middleware,
+                ROOT_URLCONF=__name__,
+                ALLOWED_HOSTS=["testserver"],
+            ):
+                timings = self.bench(url, options["requests"], options["rounds"])
+            self.stdout.write(
+                f"{label:<16} {url:<22} "
+                f"median {statistics.median(timings):7.2f} us/request"
+                f"   min {min(timings):7.2f} us/request"
+            )
+
+    def bench(self, url, requests, rounds):
+        handler = BaseHandler()
+        handler.load_middleware()
+        factory = RequestFactory()
+        # Warm up URL resolution and lazy imports before timing.
+        handler.get_response(factory.get(url))
+
+        timings = []
+        for _ in range(rounds):
+            elapsed = 0.0
+            for _ in range(requests):
+                request = factory.get(url, HTTP_AUTHORIZATION="Token bench")
+                start = time.perf_counter()
+                response = handler.get_response(request)
+                elapsed += time.perf_counter() - start
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"{url} returned status {response.status_code}"
+                    )
+            timings.append(elapsed / requests * 1e6)
+        return timings
@@ -0,0 +1,120 @@
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter so every import is paid for again.
+PROBE = """
+import os
+import sys
+import time
+
+start = time.perf_counter()
+os.environ["DJANGO_SETTINGS_MODULE"] = {settings!r}
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+ready = time.perf_counter()
+
+environ = {{
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": {path!r},
+    "QUERY_STRING": "",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80",
+    "HTTP_HOST": "localhost",
+    "wsgi.url_scheme": "http",
+    "wsgi.input": sys.stdin.buffer,
+    "wsgi.errors": sys.stderr,
+}}
+b"".join(application(environ, lambda status, headers, exc_info=None: None))
+done = time.perf_counter()
+print(ready - start, done - ready)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start import time and first-request latency for one "
+        "or more settings profiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            help="Settings module to measure (repeatable). "
+            "Defaults to facebook.settings and facebook.settings_api.",
+        )
+        parser.add_argument(
+            "--path",
+            default="/connection/friends/",
+            help="Path of the first request sent to the application.",
+        )
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument(
+            "--top", type=int, default=10, help="Packages shown in the breakdown."
+        )
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"] or ["facebook.settings", "facebook.settings_api"]
+        for profile in profiles:
+            self.stdout.write(self.style.MIGRATE_HEADING(profile))
+            self.bench_profile(profile, options)
+
+    def run_probe(self, profile, path, importtime=False):
+        cmd = [sys.executable]
+        if importtime:
+            cmd += ["-X", "importtime"]
+        cmd += ["-c", PROBE.format(settings=profile, path=path)]
+        result = subprocess.run(
+            cmd,
+            cwd=settings.BASE_DIR,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        startup, first_request = map(float, result.stdout.split()[-2:])
+        return startup, first_request, result.stderr
+
+    def bench_profile(self, profile, options):
+        startups, first_requests = [], []
+        for _ in range(options["runs"]):
+            startup, first_request, _ = self.run_probe(profile, options["path"])
+            startups.append(startup)
+            first_requests.append(first_request)
+
+        self.stdout.write(
+            f"  startup        median {statistics.median(startups) * 1000:8.1f} ms"
+            f"   min {min(startups) * 1000:8.1f} ms"
+        )
+        self.stdout.write(
+            f"  first request  median {statistics.median(first_requests) * 1000:8.1f} ms"
+            f"   min {min(first_requests) * 1000:8.1f} ms"
+        )
+        totals = [a + b for a, b in zip(startups, first_requests)]
+        self.stdout.write(
+            f"  total          median {statistics.median(totals) * 1000:8.1f} ms"
+            f"   min {min(totals) * 1000:8.1f} ms"
+        )
+
+        _, _, stderr = self.run_probe(profile, options["path"], importtime=True)
+        per_package = defaultdict(int)
+        modules = 0
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            per_package[name.strip().split(".")[0]] += int(self_us)
+            modules += 1
+
+        total = sum(per_package.values())
+        self.stdout.write(f"  imports        {modules} modules, {total / 1000:.1f} ms self time")
+        ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in ranked[: options["top"]]:
+            self.stdout.write(f"    {package:<30} {self_us / 1000:8.1f} ms")
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from connection.jobs import enqueue, get_registry
+
+
+class Command(BaseCommand):
+    help = "Queue a background task for run_workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("task", help=f"One of: {', '.join(sorted(get_registry()))}.")
+        parser.add_argument(
+            "--params",
+            default="{}",
+            help='Task parameters as JSON, e.g. \'{"older_than_days": 30}\'.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            params = json.loads(options["params"])
+        except ValueError as exc:
+            raise CommandError(f"--params is not valid JSON: {exc}")
+        if not isinstance(params, dict):
+            raise CommandError("--params must be a JSON object.")
+        try:
+            job = enqueue(options["task"], **params)
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f"Queued {job}."))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from connection.tasks import PurgeExpiredTokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired signed-token rows in bounded batches. Runs the "
+        "purge_expired_tokens background task inline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches.",
+        )
+
+    def handle(self, *args, **options):
+        task = PurgeExpiredTokens({})
+        checkpoint = {}
+        total = 0
+        while checkpoint is not None:
+            with transaction.atomic():
+                deleted, checkpoint = task.run_chunk(checkpoint, options["batch_size"])
+            total += deleted
+            if checkpoint is not None and options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} expired token(s)."))
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from connection.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run background jobs from the BackgroundJob queue with a pool of "
+        "worker processes, each running a number of threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling for more.",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] == 1:
+            self.run_threads(options["threads"], options["burst"])
+            return
+
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=self.run_threads, args=(options["threads"], options["burst"])
+            )
+            for _ in range(options["processes"])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop_children(signum, frame):
+            # Each child releases its jobs at the next checkpoint on SIGTERM
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        # Installed after the forks so children do not inherit it
+        signal.signal(signal.SIGTERM, stop_children)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
+    def run_threads(self, count, burst):
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        threads = [
+            threading.Thread(target=self.work, args=(index, stop_event, burst))
+            for index in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+
+    def work(self, index, stop_event, burst):
+        worker = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        try:
+            while not stop_event.is_set():
+                job = claim_job(worker)
+                if job is None:
+                    if burst:
+                        return
+                    stop_event.wait(settings.JOB_POLL_INTERVAL)
+                    continue
+                self.stdout.write(f"{worker} running {job}")
+                run_job(job, stop_event)
+        finally:
+            connections.close_all()
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.11 on 2026-10-19 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connection', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['friend_status', '-id'], name='friendship_friend_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['request_status', '-id'], name='friendship_request_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='friendship',
+            index=models.Index(fields=['reject_status', '-id'], name='friendship_reject_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.11 on 2026-10-19 19:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('connection', '0005_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendshipVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='friendship_version', serialize=False, to='auth.user')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.11 on 2026-10-19 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('connection', '0006_friendshipversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendshipChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_user_id', models.IntegerField()),
+                ('to_user_id', models.IntegerField()),
+                ('added', models.BooleanField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -8,9 +8,116 @@ class Friendship(models.Model):
     friend_status = models.BooleanField(default=False) 
     request_status = models.BooleanField(default=True)  
     reject_status = models.BooleanField(default=False)  
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.from_user.username} -> {self.to_user.username} : {self.friend_status}"
 
     class Meta:
         unique_together = ('from_user', 'to_user')  
+        indexes = [
+            # Back the admin list filters on each friendship state
+            models.Index(fields=['friend_status', '-id'], name='friendship_friend_idx'),
+            models.Index(fields=['request_status', '-id'], name='friendship_request_idx'),
+            models.Index(fields=['reject_status', '-id'], name='friendship_reject_idx'),
+        ]
+
+
+class Block(models.Model):
+    blocker = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='blocks_made')
+    blocked = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='blocks_received')
+
+    def __str__(self):
+        return f"{self.blocker.username} blocked {self.blocked.username}"
+
+    class Meta:
+        unique_together = ('blocker', 'blocked')
+        indexes = [
+            # Reverse lookup for "who blocked me" in the search anti-join
+            models.Index(fields=['blocked', 'blocker'], name='block_blocked_idx'),
+        ]
+
+
+class AuthToken(models.Model):
+    """
+    Current signed-token state of a user. Tokens themselves are not stored:
+    they are signed over (user id, version, expiry), so bumping `version`
+    revokes every token issued before it.
+    """
+    user = models.OneToOneField('auth.User', on_delete=models.CASCADE, primary_key=True, related_name='signed_token')
+    version = models.PositiveIntegerField(default=1)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version} until {self.expires_at}"
+
+
+class BackgroundJob(models.Model):
+    """
+    Queued run of a connection.jobs task. `checkpoint` is saved in the same
+    transaction as each chunk of work, so a job picked up again after a
+    crash resumes where the last committed chunk stopped. A failed run is
+    queued again until `attempts` reaches JOB_MAX_ATTEMPTS, not before
+    `run_after`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    checkpoint = models.JSONField(default=dict, blank=True)
+    processed = models.PositiveBigIntegerField(default=0)
+    chunks = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} : {self.status}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='job_status_idx'),
+        ]
+
+
+class FriendshipVersion(models.Model):
+    """
+    Counter bumped in the same transaction as every friendship or block
+    change touching `user`; the friend list ETags are derived from it.
+    """
+    user = models.OneToOneField('auth.User', on_delete=models.CASCADE, primary_key=True, related_name='friendship_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+
+class FriendshipChange(models.Model):
+    """
+    Append-only log of accepted-friendship edges added or removed, written
+    in the same transaction as the Friendship change. Workers replay rows
+    newer than their snapshot onto the in-memory friend graph.
+    """
+    from_user_id = models.IntegerField()
+    to_user_id = models.IntegerField()
+    added = models.BooleanField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        sign = '+' if self.added else '-'
+        return f"{sign} {self.from_user_id} -> {self.to_user_id}"
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Block, Friendship, FriendshipChange
+from .versions import bump_versions
+
+
+@receiver(post_save, sender=Friendship)
+@receiver(post_delete, sender=Friendship)
+def bump_friendship_versions(sender, instance, **kwargs):
+    bump_versions(instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_save, sender=Block)
+@receiver(post_delete, sender=Block)
+def bump_block_versions(sender, instance, **kwargs):
+    # Blocks change what search shows to both users
+    bump_versions(instance.blocker_id, instance.blocked_id)
+
+
+@receiver(post_save, sender=Friendship)
+@receiver(post_delete, sender=Friendship)
+def log_friend_graph_change(sender, instance, signal, **kwargs):
+    # Only accepted friendships are edges of the friend graph; a new pending
+    # request or the delete of one never was
+    if signal is post_save:
+        if instance.friend_status:
+            added = True
+        elif kwargs["created"]:
+            return
+        else:
+            added = False
+    elif instance.friend_status:
+        added = False
+    else:
+        return
+    FriendshipChange.objects.create(
+        from_user_id=instance.from_user_id,
+        to_user_id=instance.to_user_id,
+        added=added,
+    )
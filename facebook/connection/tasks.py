@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .jobs import ChunkedTask, register
+from .models import AuthToken, Friendship, FriendshipChange
+
+
+@register
+class PurgeRejectedFriendships(ChunkedTask):
+    """
+    Delete friend requests rejected more than `older_than_days` days ago.
+    The cutoff is fixed when the job starts so resumed runs agree on it.
+    """
+
+    name = "purge_rejected_friendships"
+
+    def run_chunk(self, checkpoint, chunk_size):
+        cutoff = checkpoint.get("cutoff")
+        if cutoff is None:
+            cutoff = (
+                timezone.now() - timedelta(days=self.params.get("older_than_days", 30))
+            ).isoformat()
+        rejected = Friendship.objects.filter(
+            reject_status=True, updated_at__lt=parse_datetime(cutoff)
+        )
+        ids = list(
+            rejected.filter(id__gt=checkpoint.get("last_id", 0))
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return 0, None
+        deleted, _ = rejected.filter(id__in=ids).delete()
+        return deleted, {"cutoff": cutoff, "last_id": ids[-1]}
+
+
+@register
+class RepairFriendshipPairs(ChunkedTask):
+    """
+    Make sure every accepted Friendship row has an accepted mirror row,
+    fixing pairs left half-written by a failed accept.
+    """
+
+    name = "repair_friendship_pairs"
+
+    def run_chunk(self, checkpoint, chunk_size):
+        rows = list(
+            Friendship.objects.filter(
+                friend_status=True, id__gt=checkpoint.get("last_id", 0)
+            )
+            .order_by("id")
+            .values_list("id", "from_user_id", "to_user_id")[:chunk_size]
+        )
+        if not rows:
+            return 0, None
+        mirrored = set(
+            Friendship.objects.filter(
+                friend_status=True,
+                from_user_id__in={to_id for _, _, to_id in rows},
+                to_user_id__in={from_id for _, from_id, _ in rows},
+            ).values_list("from_user_id", "to_user_id")
+        )
+        for _, from_id, to_id in rows:
+            if (to_id, from_id) not in mirrored:
+                Friendship.objects.update_or_create(
+                    from_user_id=to_id,
+                    to_user_id=from_id,
+                    defaults={
+                        "friend_status": True,
+                        "request_status": False,
+                        "reject_status": False,
+                    },
+                )
+        return len(rows), {"last_id": rows[-1][0]}
+
+
+@register
+class PurgeFriendshipChanges(ChunkedTask):
+    """
+    Delete friend graph change rows older than `older_than_hours` hours.
+    Workers rebuild their snapshot every FRIEND_GRAPH_MAX_AGE seconds, so
+    rows older than that are no longer replayed.
+    """
+
+    name = "purge_friendship_changes"
+
+    def run_chunk(self, checkpoint, chunk_size):
+        cutoff = checkpoint.get("cutoff")
+        if cutoff is None:
+            cutoff = (
+                timezone.now() - timedelta(hours=self.params.get("older_than_hours", 24))
+            ).isoformat()
+        old = FriendshipChange.objects.filter(created_at__lt=parse_datetime(cutoff))
+        ids = list(old.order_by("id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return 0, None
+        deleted, _ = old.filter(id__in=ids).delete()
+        return deleted, {"cutoff": cutoff}
+
+
+@register
+class PurgeExpiredTokens(ChunkedTask):
+    """
+    Delete signed-token rows that expired before the job started. The
+    purge_expired_tokens management command runs it inline.
+    """
+
+    name = "purge_expired_tokens"
+
+    def run_chunk(self, checkpoint, chunk_size):
+        cutoff = checkpoint.get("cutoff") or timezone.now().isoformat()
+        expired = AuthToken.objects.filter(expires_at__lte=parse_datetime(cutoff))
+        pks = list(expired.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return 0, None
+        deleted, _ = expired.filter(pk__in=pks).delete()
+        return deleted, {"cutoff": cutoff}
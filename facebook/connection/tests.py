@@ -1,3 +1,657 @@
-from django.test import TestCase
+import signal
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from . import tokens
+from .graph import FriendGraph, GraphTimeout, friend_graph
+from .jobs import claim_job, enqueue, run_job
+from .models import AuthToken, BackgroundJob, Block, Friendship, FriendshipChange
+from .pagination import StandardResultsSetPagination
+from .tasks import PurgeRejectedFriendships
+from .versions import get_version
+
+
+def auth(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    return {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+
+
+class FriendListConditionalGetTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+
+    def test_matching_etag_returns_304_without_running_the_list(self):
+        headers = auth(self.bob)
+        response = self.client.get("/connection/pending/", **headers)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+
+        # Token lookup and version lookup only
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                "/connection/pending/", HTTP_IF_NONE_MATCH=etag, **headers
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_friendship_change_invalidates_etag(self):
+        etag = self.client.get("/connection/pending/", **auth(self.bob))["ETag"]
+        self.client.post(f"/connection/send_request/{self.bob.id}/", **auth(self.alice))
+
+        response = self.client.get(
+            "/connection/pending/", HTTP_IF_NONE_MATCH=etag, **auth(self.bob)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since_alone_is_not_answered_with_304(self):
+        response = self.client.get(
+            "/connection/friends/",
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+            **auth(self.alice),
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_version_is_bumped_in_the_writing_transaction(self):
+        before = get_version(self.alice.id)
+        Friendship.objects.create(from_user=self.alice, to_user=self.bob)
+        self.assertEqual(get_version(self.alice.id), before + 1)
+        self.assertEqual(get_version(self.bob.id), 1)
+
+
+class BlockUserTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        Friendship.objects.create(
+            from_user=self.alice,
+            to_user=self.bob,
+            friend_status=True,
+            request_status=False,
+        )
+
+    def test_block_removes_friendship(self):
+        response = self.client.post(
+            f"/connection/block/{self.bob.id}/", **auth(self.alice)
+        )
+        self.assertEqual(response.json()["code"], 200)
+        self.assertTrue(Block.objects.filter(blocker=self.alice).exists())
+        self.assertFalse(Friendship.objects.exists())
+
+    def test_failed_friendship_delete_rolls_back_block(self):
+        headers = auth(self.alice)
+        with mock.patch.object(QuerySet, "delete", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(f"/connection/block/{self.bob.id}/", **headers)
+        self.assertFalse(Block.objects.exists())
+        self.assertTrue(Friendship.objects.exists())
+
+
+class ConnectionEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(
+            "alice", password="pw", first_name="Alice"
+        )
+        self.bob = User.objects.create_user("bob", password="pw", first_name="Bob")
+        self.carol = User.objects.create_user(
+            "carol", password="pw", first_name="Carol"
+        )
+
+    def post(self, user, path):
+        return self.client.post(path, **auth(user)).json()
+
+    def search(self, user, term):
+        response = self.client.get(
+            "/connection/search-users/", {"search": term}, **auth(user)
+        )
+        return [row["username"] for row in response.json()["data"]]
+
+    def test_unfriend_removes_both_rows(self):
+        self.post(self.alice, f"/connection/send_request/{self.bob.id}/")
+        self.post(self.bob, f"/connection/accept_request/{self.alice.id}/")
+        self.assertEqual(Friendship.objects.filter(friend_status=True).count(), 2)
+
+        response = self.post(self.bob, f"/connection/unfriend/{self.alice.id}/")
+        self.assertEqual(response["code"], 200)
+        self.assertFalse(Friendship.objects.exists())
+
+        response = self.post(self.bob, f"/connection/unfriend/{self.alice.id}/")
+        self.assertEqual(response["code"], 404)
+
+    def test_unfriend_leaves_pending_request(self):
+        self.post(self.alice, f"/connection/send_request/{self.bob.id}/")
+        response = self.post(self.alice, f"/connection/unfriend/{self.bob.id}/")
+        self.assertEqual(response["code"], 404)
+        self.assertTrue(Friendship.objects.exists())
+
+    def test_unblock_lifts_the_block(self):
+        self.post(self.alice, f"/connection/block/{self.bob.id}/")
+        response = self.post(self.bob, f"/connection/send_request/{self.alice.id}/")
+        self.assertEqual(response["code"], 403)
+        # Only the blocker can lift a block
+        response = self.post(self.bob, f"/connection/unblock/{self.alice.id}/")
+        self.assertEqual(response["code"], 404)
+
+        response = self.post(self.alice, f"/connection/unblock/{self.bob.id}/")
+        self.assertEqual(response["code"], 200)
+        self.assertFalse(Block.objects.exists())
+        response = self.post(self.bob, f"/connection/send_request/{self.alice.id}/")
+        self.assertEqual(response["code"], 201)
+
+        response = self.post(self.alice, f"/connection/unblock/{self.bob.id}/")
+        self.assertEqual(response["code"], 404)
+
+    def test_user_who_rejected_the_searcher_is_hidden(self):
+        self.post(self.alice, f"/connection/send_request/{self.bob.id}/")
+        self.post(self.bob, f"/connection/reject_request/{self.alice.id}/")
+
+        self.assertEqual(self.search(self.alice, "bob"), [])
+        self.assertEqual(self.search(self.carol, "bob"), ["bob"])
+        # The rule only hides the user who rejected, not the other way round
+        self.assertEqual(self.search(self.bob, "alice"), ["alice"])
+
+    def test_blocks_hide_users_both_ways(self):
+        self.post(self.alice, f"/connection/block/{self.bob.id}/")
+        self.assertEqual(self.search(self.alice, "bob"), [])
+        self.assertEqual(self.search(self.bob, "alice"), [])
+        self.assertEqual(self.search(self.carol, "bob"), ["bob"])
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        tokens.versions.entries.clear()
+        self.alice = User.objects.create_user("alice", password="pw")
+
+    def get_friends(self, key):
+        return self.client.get(
+            "/connection/friends/", HTTP_AUTHORIZATION=f"Token {key}"
+        )
+
+    def test_api_token_auth_issues_signed_token(self):
+        response = self.client.post(
+            "/api-token-auth/", {"username": "alice", "password": "pw"}
+        )
+        key = response.json()["token"]
+        self.assertIn(":", key)
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(self.get_friends(key).status_code, 200)
+
+    def test_forged_token_is_rejected(self):
+        key = tokens.issue_token(self.alice)
+        user_id, version, expires, signature = key.split(":")
+        forged = f"{user_id}:{version}:{int(expires) + 3600}:{signature}"
+        self.assertEqual(self.get_friends(forged).status_code, 401)
+
+    def test_expired_token_is_rejected(self):
+        key = tokens.issue_token(self.alice)
+        later = time.time() + settings.AUTH_TOKEN_LIFETIME + 1
+        with mock.patch("connection.tokens.time.time", return_value=later):
+            self.assertEqual(self.get_friends(key).status_code, 401)
+
+    def test_rotated_token_is_rejected(self):
+        old = tokens.issue_token(self.alice)
+        new = tokens.rotate_token(self.alice)
+        self.assertEqual(self.get_friends(old).status_code, 401)
+        self.assertEqual(self.get_friends(new).status_code, 200)
+
+    def test_revoked_token_is_rejected(self):
+        key = tokens.issue_token(self.alice)
+        self.client.post("/connection/logout/", HTTP_AUTHORIZATION=f"Token {key}")
+        self.assertEqual(self.get_friends(key).status_code, 401)
+
+    def test_legacy_key_expires_after_token_lifetime(self):
+        token = Token.objects.create(user=self.alice)
+        self.assertEqual(self.get_friends(token.key).status_code, 200)
+
+        Token.objects.filter(pk=token.pk).update(
+            created=timezone.now()
+            - timedelta(seconds=settings.AUTH_TOKEN_LIFETIME + 1)
+        )
+        self.assertEqual(self.get_friends(token.key).status_code, 401)
+        self.assertFalse(Token.objects.exists())
+
+
+def symmetric_graph(*pairs):
+    edges = sorted(pairs + tuple((to_id, from_id) for from_id, to_id in pairs))
+    return FriendGraph.from_edges(edges)
+
+
+class ShortestPathTests(SimpleTestCase):
+    def setUp(self):
+        # 1 - 2 - 3 - 4 - 5
+        self.graph = symmetric_graph((1, 2), (2, 3), (3, 4), (4, 5))
+
+    def test_path_length(self):
+        self.assertEqual(self.graph.shortest_path(1, 5, 6, 1.0), [1, 2, 3, 4, 5])
+        self.assertEqual(self.graph.shortest_path(4, 2, 6, 1.0), [4, 3, 2])
+        self.assertEqual(self.graph.shortest_path(3, 3, 6, 1.0), [3])
+
+    def test_depth_cutoff(self):
+        self.assertIsNone(self.graph.shortest_path(1, 5, 3, 1.0))
+        self.assertEqual(len(self.graph.shortest_path(1, 5, 4, 1.0)), 5)
+
+    def test_unknown_user_is_not_connected(self):
+        self.assertIsNone(self.graph.shortest_path(1, 99, 6, 1.0))
+
+    def test_overlay_add_and_remove(self):
+        self.graph.add_edge(1, 5)
+        self.graph.add_edge(5, 1)
+        self.assertEqual(self.graph.shortest_path(1, 5, 6, 1.0), [1, 5])
+
+        self.graph.remove_edge(1, 5)
+        self.graph.remove_edge(5, 1)
+        self.graph.remove_edge(3, 4)
+        self.graph.remove_edge(4, 3)
+        self.assertIsNone(self.graph.shortest_path(1, 5, 6, 1.0))
+
+        self.graph.add_edge(3, 4)
+        self.graph.add_edge(4, 3)
+        self.assertEqual(self.graph.shortest_path(1, 5, 6, 1.0), [1, 2, 3, 4, 5])
+
+    def test_only_newest_change_applies(self):
+        self.graph.apply_change(2, 1, 5, True)
+        self.graph.apply_change(1, 1, 5, False)
+        self.graph.apply_change(2, 1, 5, False)
+        self.assertIn(5, self.graph.friends_of(1))
+
+    def test_excluded_users_are_not_crossed(self):
+        self.assertIsNone(self.graph.shortest_path(1, 5, 6, 1.0, excluded={3}))
+        self.assertIsNone(self.graph.shortest_path(1, 5, 6, 1.0, excluded={5}))
+
+        self.graph.add_edge(2, 4)
+        self.graph.add_edge(4, 2)
+        self.assertEqual(
+            self.graph.shortest_path(1, 5, 6, 1.0, excluded={3}), [1, 2, 4, 5]
+        )
+
+    def test_timeout(self):
+        with self.assertRaises(GraphTimeout):
+            self.graph.shortest_path(1, 5, 6, -1)
+
+
+@override_settings(FRIEND_GRAPH_POLL_INTERVAL=0)
+class DegreesOfSeparationTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob, self.carol, self.dave = (
+            User.objects.create_user(name, password="pw")
+            for name in ("alice", "bob", "carol", "dave")
+        )
+        # alice - dave - bob - carol
+        self.befriend(self.alice, self.dave)
+        self.befriend(self.dave, self.bob)
+        self.befriend(self.bob, self.carol)
+
+    def tearDown(self):
+        friend_graph.graph = None
+
+    def befriend(self, first, second):
+        for from_user, to_user in ((first, second), (second, first)):
+            Friendship.objects.create(
+                from_user=from_user,
+                to_user=to_user,
+                friend_status=True,
+                request_status=False,
+            )
+
+    def separation(self, user, target):
+        return self.client.get(
+            f"/connection/separation/{target.id}/", **auth(user)
+        ).json()
+
+    def test_loading_graph_returns_503(self):
+        with mock.patch.object(friend_graph, "start") as start:
+            response = self.separation(self.alice, self.carol)
+        start.assert_called_once()
+        self.assertEqual(response["code"], 503)
+
+    def test_changes_are_replayed_from_the_log(self):
+        friend_graph.load()
+        self.assertEqual(self.separation(self.alice, self.carol)["data"]["degree"], 3)
+
+        self.befriend(self.alice, self.carol)
+        self.assertEqual(self.separation(self.alice, self.carol)["data"]["degree"], 1)
+
+        Friendship.objects.filter(from_user=self.dave, to_user=self.bob).delete()
+        Friendship.objects.filter(from_user=self.bob, to_user=self.dave).delete()
+        self.assertEqual(self.separation(self.alice, self.bob)["data"]["degree"], 2)
+
+    def test_blocked_users_are_not_reached_or_crossed(self):
+        friend_graph.load()
+        Block.objects.create(blocker=self.bob, blocked=self.alice)
+        self.assertEqual(self.separation(self.alice, self.bob)["code"], 404)
+        self.assertEqual(self.separation(self.alice, self.carol)["code"], 404)
+        self.assertEqual(self.separation(self.dave, self.carol)["data"]["degree"], 2)
+
+        Block.objects.all().delete()
+        Block.objects.create(blocker=self.alice, blocked=self.carol)
+        self.assertEqual(self.separation(self.alice, self.carol)["code"], 404)
+
+
+@override_settings(JOB_CHUNK_PAUSE=0, JOB_MAX_ATTEMPTS=2, JOB_RETRY_BACKOFF=30)
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        self.job = enqueue("purge_rejected_friendships")
+
+    def test_failed_run_is_retried_with_backoff(self):
+        locked = DatabaseError("database is locked")
+        with mock.patch.object(
+            PurgeRejectedFriendships, "run_chunk", side_effect=locked
+        ):
+            run_job(claim_job("w1"))
+            self.job.refresh_from_db()
+            self.assertEqual(self.job.status, BackgroundJob.QUEUED)
+            self.assertEqual(self.job.attempts, 1)
+            self.assertGreater(self.job.run_after, timezone.now())
+            # Not claimable again until the backoff has passed
+            self.assertIsNone(claim_job("w1"))
+
+            BackgroundJob.objects.update(run_after=timezone.now())
+            run_job(claim_job("w1"))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, BackgroundJob.FAILED)
+        self.assertEqual(self.job.attempts, 2)
+
+    def test_worker_that_lost_the_job_does_not_save_its_checkpoint(self):
+        job = claim_job("w1")
+        # The heartbeat went stale and another worker took the job over
+        BackgroundJob.objects.update(worker="w2")
+
+        with mock.patch.object(
+            PurgeRejectedFriendships, "run_chunk", return_value=(5, None)
+        ):
+            run_job(job)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, BackgroundJob.RUNNING)
+        self.assertEqual(self.job.worker, "w2")
+        self.assertEqual(self.job.processed, 0)
+        self.assertEqual(self.job.chunks, 0)
+
+    def test_purge_expired_tokens_command(self):
+        alice = User.objects.create_user("alice", password="pw")
+        bob = User.objects.create_user("bob", password="pw")
+        AuthToken.objects.create(user=alice, expires_at=timezone.now())
+        AuthToken.objects.create(
+            user=bob, expires_at=timezone.now() + timedelta(days=1)
+        )
+        call_command("purge_expired_tokens", batch_size=1, stdout=mock.Mock())
+        self.assertEqual(
+            list(AuthToken.objects.values_list("user", flat=True)), [bob.id]
+        )
+
+
+@override_settings(JOB_CHUNK_PAUSE=0)
+class ChunkedTaskTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(f"user{index}", password="pw")
+            for index in range(6)
+        ]
+
+    def request(self, from_index, to_index, **fields):
+        return Friendship.objects.create(
+            from_user=self.users[from_index], to_user=self.users[to_index], **fields
+        )
+
+    def rejected(self, from_index, to_index, days_ago):
+        friendship = self.request(
+            from_index, to_index, request_status=False, reject_status=True
+        )
+        Friendship.objects.filter(pk=friendship.pk).update(
+            updated_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return friendship.pk
+
+    def test_purge_rejected_friendships_resumes_from_checkpoint(self):
+        old = [self.rejected(0, index, 40) for index in range(1, 6)]
+        recent = self.rejected(1, 2, 5)
+        pending = self.request(2, 3).pk
+        job = enqueue("purge_rejected_friendships", older_than_days=30, chunk_size=2)
+
+        # Stopped after the first chunk: back in the queue at its checkpoint
+        stop_event = mock.Mock()
+        stop_event.is_set.side_effect = [False, True]
+        run_job(claim_job("w1"), stop_event)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.QUEUED)
+        self.assertEqual(job.processed, 2)
+        self.assertEqual(job.checkpoint["last_id"], old[1])
+        self.assertEqual(Friendship.objects.filter(pk__in=old).count(), 3)
+
+        run_job(claim_job("w2"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.DONE)
+        self.assertEqual(job.processed, 5)
+        self.assertEqual(
+            set(Friendship.objects.values_list("pk", flat=True)), {recent, pending}
+        )
+
+    def test_purge_rejected_friendships_keeps_the_cutoff_it_started_with(self):
+        kept = self.rejected(0, 1, 40)
+        job = enqueue("purge_rejected_friendships", older_than_days=30)
+        cutoff = (timezone.now() - timedelta(days=60)).isoformat()
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            checkpoint={"cutoff": cutoff, "last_id": 0}
+        )
+
+        run_job(claim_job("w1"))
+        self.assertTrue(Friendship.objects.filter(pk=kept).exists())
+
+    def test_repair_friendship_pairs(self):
+        accepted = {"friend_status": True, "request_status": False}
+        # Missing mirror
+        self.request(0, 1, **accepted)
+        # Mirror left pending
+        self.request(2, 3, **accepted)
+        self.request(3, 2)
+        # Already consistent
+        self.request(4, 5, **accepted)
+        self.request(5, 4, **accepted)
+        job = enqueue("repair_friendship_pairs", chunk_size=2)
+
+        run_job(claim_job("w1"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.DONE)
+        # The repaired 3 -> 2 row and the new 1 -> 0 row are scanned as well
+        self.assertEqual(job.processed, 6)
+        self.assertEqual(job.chunks, 4)
+        self.assertFalse(Friendship.objects.filter(friend_status=False).exists())
+        pairs = set(Friendship.objects.values_list("from_user", "to_user"))
+        self.assertEqual(pairs, {(to_id, from_id) for from_id, to_id in pairs})
+        self.assertEqual(len(pairs), 6)
+
+
+class RunWorkersTests(SimpleTestCase):
+    def test_sigterm_in_parent_stops_children(self):
+        handlers = {}
+        children = []
+
+        class FakeProcess:
+            def __init__(self, target, args):
+                self.alive = True
+                self.terminated = False
+                children.append(self)
+
+            def start(self):
+                pass
+
+            def is_alive(self):
+                return self.alive
+
+            def terminate(self):
+                self.terminated = True
+
+            def join(self):
+                # The supervisor's SIGTERM arrives while the parent waits
+                if signal.SIGTERM in handlers:
+                    handlers.pop(signal.SIGTERM)(signal.SIGTERM, None)
+                self.alive = False
+
+        command = "connection.management.commands.run_workers"
+        with mock.patch(f"{command}.multiprocessing.Process", FakeProcess), mock.patch(
+            f"{command}.signal.signal", side_effect=handlers.__setitem__
+        ):
+            call_command("run_workers", processes=2, stdout=mock.Mock())
+
+        self.assertEqual(len(children), 2)
+        self.assertTrue(all(child.terminated for child in children))
+        self.assertFalse(any(child.alive for child in children))
+
+
+class SearchUsersTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        tokens.versions.entries.clear()
+        self.alice = User.objects.create_user(
+            "alice", password="pw", first_name="Alice"
+        )
+        self.bob = User.objects.create_user("bob", password="pw", first_name="Bob")
+        self.carol = User.objects.create_user(
+            "carol", password="pw", first_name="Carol"
+        )
+
+    def search(self, user, term):
+        key = tokens.issue_token(user)
+        response = self.client.get(
+            "/connection/search-users/",
+            {"search": term},
+            HTTP_AUTHORIZATION=f"Token {key}",
+        )
+        return [row["username"] for row in response.json()["data"]]
+
+    def test_block_hides_user_from_cached_public_page(self):
+        self.assertEqual(self.search(self.alice, "bob"), ["bob"])
+        self.assertEqual(self.search(self.carol, "bob"), ["bob"])
+
+        # bulk_create skips the signals, like a write from a process whose
+        # bumps this one never sees
+        Block.objects.bulk_create([Block(blocker=self.alice, blocked=self.bob)])
+        self.assertEqual(self.search(self.alice, "bob"), [])
+        self.assertEqual(self.search(self.carol, "bob"), ["bob"])
+
+    def test_restricted_user_blocking_someone_else_skips_cached_page(self):
+        Block.objects.create(blocker=self.alice, blocked=self.carol)
+        self.assertEqual(self.search(self.alice, "bob"), ["bob"])
+
+        key = tokens.issue_token(self.alice)
+        self.client.post(
+            f"/connection/block/{self.bob.id}/", HTTP_AUTHORIZATION=f"Token {key}"
+        )
+        self.assertEqual(self.search(self.alice, "bob"), [])
+
+    def test_concurrent_identical_searches_run_the_query_once(self):
+        calls = []
+        paginate = StandardResultsSetPagination.paginate_queryset
+
+        def slow_paginate(paginator, queryset, request, view=None):
+            calls.append(request)
+            time.sleep(0.2)
+            return paginate(paginator, queryset, request, view)
+
+        keys = [tokens.issue_token(user) for user in (self.alice, self.carol)] * 3
+        results = []
+
+        def search(key):
+            try:
+                response = self.client_class().get(
+                    "/connection/search-users/",
+                    {"search": "bob"},
+                    HTTP_AUTHORIZATION=f"Token {key}",
+                )
+                results.append(response.json()["data"])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=search, args=(key,)) for key in keys]
+        with mock.patch.object(
+            StandardResultsSetPagination, "paginate_queryset", slow_paginate
+        ):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), len(keys))
+        self.assertTrue(all(rows == results[0] for rows in results))
+
+
+class FriendshipAdminActionTests(TestCase):
+    changelist = "/admin/connection/friendship/"
+
+    def setUp(self):
+        admin = User.objects.create_superuser("admin", password="pw")
+        self.client.force_login(admin)
+        self.alice = User.objects.create_user("alice", password="pw")
+        self.bob = User.objects.create_user("bob", password="pw")
+        self.request = Friendship.objects.create(
+            from_user=self.alice, to_user=self.bob
+        )
+        self.versions = (get_version(self.alice.id), get_version(self.bob.id))
+
+    def assertVersionsBumped(self):
+        self.assertEqual(
+            (get_version(self.alice.id), get_version(self.bob.id)),
+            (self.versions[0] + 1, self.versions[1] + 1),
+        )
+
+    def run_action(self, action, list_filter):
+        return self.client.post(
+            f"{self.changelist}?{list_filter}",
+            {"action": action, "_selected_action": [self.request.pk]},
+        )
+
+    def test_accept_from_filtered_changelist(self):
+        self.run_action("accept_requests", "friend_status__exact=0")
+
+        self.assertEqual(
+            set(
+                Friendship.objects.values_list(
+                    "from_user", "to_user", "friend_status"
+                )
+            ),
+            {(self.alice.id, self.bob.id, True), (self.bob.id, self.alice.id, True)},
+        )
+        self.assertEqual(
+            set(FriendshipChange.objects.values_list("from_user_id", "added")),
+            {(self.alice.id, True), (self.bob.id, True)},
+        )
+        self.assertVersionsBumped()
+
+    def test_reject_from_filtered_changelist(self):
+        self.run_action("reject_requests", "request_status__exact=1")
+
+        self.request.refresh_from_db()
+        self.assertTrue(self.request.reject_status)
+        self.assertFalse(self.request.request_status)
+        self.assertVersionsBumped()
+
+    def test_reset_to_pending_from_filtered_changelist(self):
+        Friendship.objects.filter(pk=self.request.pk).update(
+            request_status=False, reject_status=True
+        )
+        self.run_action("reset_to_pending", "reject_status__exact=1")
+
+        self.request.refresh_from_db()
+        self.assertTrue(self.request.request_status)
+        self.assertFalse(self.request.reject_status)
+        self.assertVersionsBumped()
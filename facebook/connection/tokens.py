@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AuthToken
+
+# Tokens look like "<user id>:<version>:<expiry>:<signature>", which never
+# collides with the 40 hex characters of a rest_framework.authtoken key.
+signer = signing.Signer(salt="connection.tokens")
+
+
+class VersionCache:
+    """
+    Process-local LRU of user id -> (version, is_active, loaded_at). Entries
+    older than AUTH_TOKEN_VERSION_CACHE_TTL are re-read from the database.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] > settings.AUTH_TOKEN_VERSION_CACHE_TTL:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return entry
+
+    def set(self, user_id, version, is_active):
+        with self.lock:
+            self.entries[user_id] = (version, is_active, time.monotonic())
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > settings.AUTH_TOKEN_VERSION_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+
+versions = VersionCache()
+
+
+def make_token(state):
+    expires = int(state.expires_at.timestamp())
+    return signer.sign(f"{state.user_id}:{state.version}:{expires}")
+
+
+def issue_token(user):
+    """
+    Return the user's current token, starting a new version when there is
+    none or it has expired.
+    """
+    now = timezone.now()
+    state, created = AuthToken.objects.get_or_create(
+        user=user,
+        defaults={
+            "expires_at": now + timedelta(seconds=settings.AUTH_TOKEN_LIFETIME)
+        },
+    )
+    if state.expires_at <= now:
+        return rotate_token(user)
+    versions.set(user.pk, state.version, user.is_active)
+    return make_token(state)
+
+
+def rotate_token(user):
+    """Revoke every token of the user and issue a fresh one."""
+    expires_at = timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_LIFETIME)
+    updated = AuthToken.objects.filter(user=user).update(
+        version=F("version") + 1, expires_at=expires_at
+    )
+    if not updated:
+        return issue_token(user)
+    state = AuthToken.objects.get(user=user)
+    versions.set(user.pk, state.version, user.is_active)
+    return make_token(state)
+
+
+def revoke_tokens(user):
+    AuthToken.objects.filter(user=user).update(version=F("version") + 1)
+    versions.discard(user.pk)
+
+
+def current_version(user_id):
+    entry = versions.get(user_id)
+    if entry is None:
+        row = (
+            AuthToken.objects.filter(user_id=user_id)
+            .values_list("version", "user__is_active")
+            .first()
+        )
+        if row is None:
+            return None
+        versions.set(user_id, *row)
+        entry = versions.get(user_id)
+    version, is_active, _ = entry
+    return version if is_active else None
+
+
+def verify_token(key):
+    """
+    Return the user id the token was issued to, or None when it is forged,
+    expired or revoked. Only a version cache miss touches the database.
+    """
+    try:
+        user_id, version, expires = map(int, signer.unsign(key).split(":"))
+    except (signing.BadSignature, ValueError):
+        return None
+    if expires <= time.time():
+        return None
+    if current_version(user_id) != version:
+        return None
+    return user_id
@@ -4,10 +4,16 @@ from . import views
 urlpatterns = [
     path("create/", views.create_user),
     path("login/", views.login_user),
+    path("logout/", views.logout_user, name='logout'),
+    path("token/rotate/", views.rotate_user_token, name='rotate-token'),
     path('search-users/', views.search_users, name='search-users'),
     path('send_request/<int:user_id>/', views.send_friend_request, name='send-friend-request'),
     path('accept_request/<int:user_id>/', views.accept_friend_request, name='accept-friend-request'),
     path('reject_request/<int:user_id>/', views.reject_friend_request, name='reject-friend-request'),
+    path('unfriend/<int:user_id>/', views.unfriend, name='unfriend'),
+    path('block/<int:user_id>/', views.block_user, name='block-user'),
+    path('unblock/<int:user_id>/', views.unblock_user, name='unblock-user'),
     path('friends/', views.list_friends, name='list-friends'),
-    path('pending/', views.pending_request, name='pending-request')
+    path('pending/', views.pending_request, name='pending-request'),
+    path('separation/<int:user_id>/', views.degrees_of_separation, name='degrees-of-separation'),
 ]
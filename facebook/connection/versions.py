@@ -0,0 +1,70 @@
+from functools import wraps
+
+from django.db.models import F
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .models import FriendshipVersion
+
+
+def bump_versions(*user_ids):
+    """
+    Bump the friendship version of each user. Call it inside the transaction
+    that changes their friendships so the data and the new stamp commit
+    together.
+    """
+    user_ids = set(user_ids)
+    FriendshipVersion.objects.bulk_create(
+        [FriendshipVersion(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    FriendshipVersion.objects.filter(user_id__in=user_ids).update(
+        version=F("version") + 1
+    )
+
+
+def bump_versions_for(queryset, batch_size=1000):
+    """Bump both users of every Friendship in `queryset`, in batches."""
+    user_ids = set()
+    for pair in queryset.values_list("from_user_id", "to_user_id").iterator():
+        user_ids.update(pair)
+        if len(user_ids) >= batch_size:
+            bump_versions(*user_ids)
+            user_ids = set()
+    if user_ids:
+        bump_versions(*user_ids)
+
+
+def get_version(user_id):
+    version = (
+        FriendshipVersion.objects.filter(user_id=user_id)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def friendship_condition(scope):
+    """
+    Answer conditional GETs for the authenticated user's friendship lists
+    from the version stamp alone, running the view only when it changed.
+    Only a matching If-None-Match gets a 304; no Last-Modified is sent since
+    a timestamp cannot tell apart two changes within the same second.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def inner(request, *args, **kwargs):
+            user_id = request.user.pk
+            etag = quote_etag(f"{scope}-{user_id}-{get_version(user_id)}")
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = func(request, *args, **kwargs)
+
+            if request.method in ("GET", "HEAD"):
+                response.setdefault("ETag", etag)
+            return response
+
+        return inner
+
+    return decorator
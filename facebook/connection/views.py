@@ -1,31 +1,29 @@
+from django.conf import settings
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
-from .serializers import LoginSerializer
 from rest_framework.decorators import (
     api_view,
     authentication_classes,
     permission_classes,
     throttle_classes,
 )
-from rest_framework.pagination import PageNumberPagination
-from .serializers import UserSerializer
-from django.db.models import Q
-from .models import Friendship
-from rest_framework import status, viewsets
-from rest_framework.decorators import action
-from .serializers import (
-    FriendshipSerializer,
-    PendingListResponseSerializer,
-    FriendShipListResponseSerializer,
-)
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from .models import Block, Friendship
 from rest_framework.permissions import AllowAny
+from .authentication import ExpiringTokenAuthentication, SignedTokenAuthentication
 from .helper import FriendRequestRateThrottle, helper_response
+from .tokens import issue_token, revoke_tokens, rotate_token
+from .versions import friendship_condition, get_version
 import logging
 
+# Serializers, pagination, the search cache and the friend graph are imported
+# inside the views that use them, so a worker only loads what its traffic
+# actually needs.
+
 logger = logging.getLogger("django")
 
 
@@ -43,6 +41,8 @@ def create_user(request):
         "last_name":"kong"
     }
     """
+    from .serializers import UserSerializer
+
     if request.method == "POST":
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
@@ -79,16 +79,18 @@ def login_user(request):
             "password": "kong"
     }
     """
+    from .serializers import LoginSerializer
+
     logger.debug("Executing register user api")
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data
-        token, created = Token.objects.get_or_create(user=user)
+        token = issue_token(user)
         logger.info(f"User logged in successfully: {user}")
         return Response(
             helper_response(
                 True,
-                {"token": token.key},
+                {"token": token},
                 status.HTTP_200_OK,
                 "User logged in successfully",
             )
@@ -105,43 +107,153 @@ def login_user(request):
         )
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-    max_page_size = 100
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+def logout_user(request):
+    """
+    endpoint - http://localhost:8000/connection/logout/
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    revoke_tokens(request.user)
+    Token.objects.filter(user=request.user).delete()
+    logger.info("User logged out successfully.")
+    return Response(
+        helper_response(
+            True, None, status.HTTP_200_OK, "User logged out successfully"
+        )
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+def rotate_user_token(request):
+    """
+    endpoint - http://localhost:8000/connection/token/rotate/
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    token = rotate_token(request.user)
+    logger.info("Token rotated successfully.")
+    return Response(
+        helper_response(
+            True, {"token": token}, status.HTTP_200_OK, "Token rotated successfully"
+        )
+    )
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@authentication_classes([])
+def obtain_auth_token(request):
+    """
+    endpoint - http://localhost:8000/api-token-auth/
+    body - username=kong&password=kong
+
+    Drop-in for rest_framework's obtain_auth_token that hands out an
+    expiring signed token instead of a permanent authtoken key.
+    """
+    from rest_framework.authtoken.serializers import AuthTokenSerializer
+
+    serializer = AuthTokenSerializer(
+        data=request.data, context={"request": request}
+    )
+    serializer.is_valid(raise_exception=True)
+    return Response({"token": issue_token(serializer.validated_data["user"])})
+
+
+def visible_users(user):
+    """
+    Users `user` may see in search: excludes anyone they blocked, anyone who
+    blocked them and anyone who rejected their friend request. Each rule is
+    a NOT EXISTS against an indexed table so pagination stays in SQL.
+    """
+    return User.objects.filter(
+        ~Exists(Block.objects.filter(blocker=user, blocked=OuterRef("pk"))),
+        ~Exists(Block.objects.filter(blocker=OuterRef("pk"), blocked=user)),
+        ~Exists(
+            Friendship.objects.filter(
+                from_user=user, to_user=OuterRef("pk"), reject_status=True
+            )
+        ),
+    )
+
+
+def visibility_context(user):
+    """
+    "public" when nothing is hidden from `user` in search, so their results
+    can be shared with everyone else in that state; otherwise per-user.
+    Checked on every request: a stale "public" would serve users hidden by
+    a block or rejection.
+    """
+    restricted = (
+        Block.objects.filter(Q(blocker=user) | Q(blocked=user)).exists()
+        or Friendship.objects.filter(from_user=user, reject_status=True).exists()
+    )
+    return f"user:{user.pk}" if restricted else "public"
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
 def search_users(request):
     """
     endpoint -http://127.0.0.1:8000/connection/search-users/?search=sarthak
     Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
     Content-Type: application/json
     """
-    search_query = request.query_params.get("search", None)
-    if search_query:
-        users = User.objects.filter(
-            Q(email__icontains=search_query)
-            | Q(first_name__icontains=search_query)
-            | Q(last_name__icontains=search_query)
+    from .coalesce import coalesce, make_key
+    from .pagination import StandardResultsSetPagination
+    from .serializers import UserSerializer
+
+    search_query = request.query_params.get("search", "").strip().lower()
+    if not search_query:
+        logger.info(f"Search users successful for query: {search_query}")
+        return Response(
+            helper_response(True, [], status.HTTP_200_OK, "Search users successful")
         )
-    else:
-        users = User.objects.none()
+
+    context = visibility_context(request.user)
+    users = visible_users(request.user) if context != "public" else User.objects
+    users = users.filter(
+        Q(email__icontains=search_query)
+        | Q(first_name__icontains=search_query)
+        | Q(last_name__icontains=search_query)
+    ).order_by("id")
+
+    if context != "public":
+        # Per-user pages change with the user's own blocks and rejections,
+        # which bump their friendship version
+        context = f"{context}:{get_version(request.user.pk)}"
 
     paginator = StandardResultsSetPagination()
-    paginated_users = paginator.paginate_queryset(users, request)
-    serializer = UserSerializer(paginated_users, many=True)
+    key = make_key(
+        "search-users",
+        search_query,
+        request.query_params.get(paginator.page_query_param, "1"),
+        paginator.get_page_size(request),
+        context,
+    )
+
+    def run_search():
+        paginated_users = paginator.paginate_queryset(users, request)
+        return list(UserSerializer(paginated_users, many=True).data)
+
+    # Identical searches in flight share one query and one serialized page
+    data = coalesce(key, run_search, settings.SEARCH_CACHE_TTL)
     logger.info(f"Search users successful for query: {search_query}")
     return Response(
-        helper_response(
-            True, serializer.data, status.HTTP_200_OK, "Search users successful"
-        )
+        helper_response(True, data, status.HTTP_200_OK, "Search users successful")
     )
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
 @throttle_classes([FriendRequestRateThrottle])
+@transaction.atomic
 def send_friend_request(request, user_id):
     """
     endpoint - http://127.0.0.1:8000/connection/send_request/5("user id of the person whom you want to send request")/
@@ -155,6 +267,16 @@ def send_friend_request(request, user_id):
             helper_response(False, None, status.HTTP_400_BAD_REQUEST, error_message)
         )
 
+    if Block.objects.filter(
+        Q(blocker=request.user, blocked=user_id)
+        | Q(blocker=user_id, blocked=request.user)
+    ).exists():
+        error_message = "You cannot send a friend request to this user."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_403_FORBIDDEN, error_message)
+        )
+
     friendships = Friendship.objects.filter(
         from_user_id=request.user, to_user=user_id
     ).first()
@@ -224,7 +346,8 @@ def send_friend_request(request, user_id):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+@transaction.atomic
 def accept_friend_request(request, user_id):
     """
     endpoint - http://127.0.0.1:8000/connection/accept_request/5("user id of the person whom request you want to accept")/
@@ -290,7 +413,8 @@ def accept_friend_request(request, user_id):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+@transaction.atomic
 def reject_friend_request(request, user_id):
     """
     endpoint - http://127.0.0.1:8000/connection/reject_request/5("user id of the person whom request you want to reject")/
@@ -334,15 +458,127 @@ def reject_friend_request(request, user_id):
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+@transaction.atomic
+def unfriend(request, user_id):
+    """
+    endpoint - http://127.0.0.1:8000/connection/unfriend/5("user id of the friend you want to remove")/
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    deleted, _ = Friendship.objects.filter(
+        Q(from_user=request.user, to_user=user_id)
+        | Q(from_user=user_id, to_user=request.user),
+        friend_status=True,
+    ).delete()
+    if not deleted:
+        error_message = "You are not friends."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_404_NOT_FOUND, error_message)
+        )
+    logger.info("Friend removed successfully.")
+    return Response(
+        helper_response(
+            True,
+            {"status": "Friend removed."},
+            status.HTTP_200_OK,
+            "Friend removed successfully",
+        )
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+def block_user(request, user_id):
+    """
+    endpoint - http://127.0.0.1:8000/connection/block/5("user id of the person whom you want to block")/
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    if request.user.id == int(user_id):
+        error_message = "You cannot block yourself."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_400_BAD_REQUEST, error_message)
+        )
+    if not User.objects.filter(pk=user_id).exists():
+        error_message = "User not found."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_404_NOT_FOUND, error_message)
+        )
+
+    with transaction.atomic():
+        block, created = Block.objects.get_or_create(
+            blocker=request.user, blocked_id=user_id
+        )
+        if not created:
+            error_message = "User already blocked."
+            logger.error(error_message)
+            return Response(
+                helper_response(
+                    False, None, status.HTTP_400_BAD_REQUEST, error_message
+                )
+            )
+        # Blocking ends the friendship and any pending request in either direction
+        Friendship.objects.filter(
+            Q(from_user=request.user, to_user=user_id)
+            | Q(from_user=user_id, to_user=request.user)
+        ).delete()
+    logger.info("User blocked successfully.")
+    return Response(
+        helper_response(
+            True,
+            {"status": "User blocked."},
+            status.HTTP_200_OK,
+            "User blocked successfully",
+        )
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+def unblock_user(request, user_id):
+    """
+    endpoint - http://127.0.0.1:8000/connection/unblock/5("user id of the person whom you want to unblock")/
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    deleted, _ = Block.objects.filter(blocker=request.user, blocked=user_id).delete()
+    if not deleted:
+        error_message = "User is not blocked."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_404_NOT_FOUND, error_message)
+        )
+    logger.info("User unblocked successfully.")
+    return Response(
+        helper_response(
+            True,
+            {"status": "User unblocked."},
+            status.HTTP_200_OK,
+            "User unblocked successfully",
+        )
+    )
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+@friendship_condition("friends")
 def list_friends(request):
     """
     endpoint - http://127.0.0.1:8000/connection/friends
     Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
     Content-Type: application/json
     """
+    from .serializers import FriendShipListResponseSerializer
+
     friendships = Friendship.objects.filter(
         from_user_id=request.user, friend_status=True
     )
@@ -360,13 +596,16 @@ def list_friends(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+@friendship_condition("pending")
 def pending_request(request):
     """
     endpoint - http://127.0.0.1:8000/connection/pending
     Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
     Content-Type: application/json
     """
+    from .serializers import PendingListResponseSerializer
+
     friendships = Friendship.objects.filter(to_user=request.user, request_status=True)
     serializer = PendingListResponseSerializer(friendships, many=True)
     logger.info("List of pending friend requests retrieved successfully.")
@@ -378,3 +617,77 @@ def pending_request(request):
             "List of pending friend requests retrieved successfully",
         )
     )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([SignedTokenAuthentication, ExpiringTokenAuthentication])
+def degrees_of_separation(request, user_id):
+    """
+    endpoint - http://127.0.0.1:8000/connection/separation/5("user id of the person you want to reach")/?max_depth=4
+    Authorization(Inside Header): Token 991c5df483255e0c0a3d8b8bb6e246d1a5e93aab
+    Content-Type: application/json
+    """
+    from .graph import GraphNotReady, GraphTimeout, friend_graph
+
+    try:
+        max_depth = int(
+            request.query_params.get("max_depth", settings.FRIEND_GRAPH_MAX_DEPTH)
+        )
+    except ValueError:
+        max_depth = 0
+    if not 0 < max_depth <= settings.FRIEND_GRAPH_MAX_DEPTH:
+        error_message = (
+            f"max_depth must be between 1 and {settings.FRIEND_GRAPH_MAX_DEPTH}."
+        )
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_400_BAD_REQUEST, error_message)
+        )
+
+    # Neither end of a block is reachable through the caller's network
+    excluded = set()
+    for blocker_id, blocked_id in Block.objects.filter(
+        Q(blocker=request.user) | Q(blocked=request.user)
+    ).values_list("blocker_id", "blocked_id"):
+        excluded.add(blocked_id if blocker_id == request.user.id else blocker_id)
+
+    try:
+        path = friend_graph.get().shortest_path(
+            request.user.id,
+            user_id,
+            max_depth,
+            settings.FRIEND_GRAPH_TIME_BUDGET,
+            excluded,
+        )
+    except GraphNotReady:
+        error_message = "Friend graph is loading, try again shortly."
+        logger.error(error_message)
+        return Response(
+            helper_response(
+                False, None, status.HTTP_503_SERVICE_UNAVAILABLE, error_message
+            )
+        )
+    except GraphTimeout:
+        error_message = "Search exceeded its time budget."
+        logger.error(error_message)
+        return Response(
+            helper_response(
+                False, None, status.HTTP_503_SERVICE_UNAVAILABLE, error_message
+            )
+        )
+    if path is None:
+        error_message = f"No connection found within {max_depth} degrees."
+        logger.error(error_message)
+        return Response(
+            helper_response(False, None, status.HTTP_404_NOT_FOUND, error_message)
+        )
+    logger.info("Degrees of separation retrieved successfully.")
+    return Response(
+        helper_response(
+            True,
+            {"degree": len(path) - 1, "path": path},
+            status.HTTP_200_OK,
+            "Degrees of separation retrieved successfully",
+        )
+    )
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class StatelessPathMiddleware:
+    """
+    Runs the SESSION_MIDDLEWARE chain around every request except those whose
+    path starts with one of STATELESS_PATH_PREFIXES. Token-authenticated API
+    routes go straight to the view without session, CSRF or message handling,
+    while the admin keeps the full stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.STATELESS_PATH_PREFIXES)
+        self.view_middleware = []
+        self.template_response_middleware = []
+        self.exception_middleware = []
+
+        # Same wiring as BaseHandler.load_middleware(), for the inner chain.
+        handler = get_response
+        for middleware_path in reversed(settings.SESSION_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(mw_instance, "process_view"):
+                self.view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, "process_template_response"):
+                self.template_response_middleware.append(
+                    mw_instance.process_template_response
+                )
+            if hasattr(mw_instance, "process_exception"):
+                self.exception_middleware.append(mw_instance.process_exception)
+            handler = convert_exception_to_response(mw_instance)
+        self.stateful_response = handler
+
+    def is_stateless(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if self.is_stateless(request):
+            return self.get_response(request)
+        return self.stateful_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_stateless(request):
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_stateless(request):
+            return response
+        for process_template_response in self.template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_stateless(request):
+            return None
+        for process_exception in self.exception_middleware:
+            response = process_exception(request, exception)
+            if response:
+                return response
+        return None
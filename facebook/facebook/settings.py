@@ -44,14 +44,32 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'facebook.middleware.StatelessPathMiddleware',
+]
+
+# Run by StatelessPathMiddleware for every path outside STATELESS_PATH_PREFIXES
+SESSION_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Token-authenticated routes that skip the session/CSRF/message machinery
+STATELESS_PATH_PREFIXES = [
+    '/connection/',
+    '/api-token-auth/',
+]
+
+# The admin's session, auth and message middleware live in SESSION_MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = [
+    'admin.E408',
+    'admin.E409',
+    'admin.E410',
+]
+
 ROOT_URLCONF = 'facebook.urls'
 
 TEMPLATES = [
@@ -84,6 +102,18 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Holds throttle counters and short-lived shared search results; point it at
+# a shared backend (e.g. Redis) so throttles apply across worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -129,7 +159,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'connection.authentication.SignedTokenAuthentication',
+        'connection.authentication.ExpiringTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -139,6 +170,49 @@ REST_FRAMEWORK = {
     }
 }
 
+# Lifetime in seconds of the signed API tokens issued by connection.tokens;
+# legacy rest_framework.authtoken keys expire this long after Token.created
+AUTH_TOKEN_LIFETIME = 60 * 60 * 24 * 7
+
+# Seconds a worker trusts its in-memory copy of a user's token version; this
+# bounds how long a logout or rotation takes to reach other processes
+AUTH_TOKEN_VERSION_CACHE_TTL = 60
+AUTH_TOKEN_VERSION_CACHE_SIZE = 100000
+
+# Degrees-of-separation search over the in-memory friend graph
+# (connection.graph): hop limit, per-query time budget in seconds, seconds
+# between polls of the FriendshipChange log, seconds each poll looks back
+# for changes from transactions that committed late, and the age in seconds
+# after which a worker rebuilds its snapshot to fold in the polled changes
+FRIEND_GRAPH_MAX_DEPTH = 6
+FRIEND_GRAPH_TIME_BUDGET = 0.05
+FRIEND_GRAPH_POLL_INTERVAL = 1
+FRIEND_GRAPH_CHANGE_LAG = 10
+FRIEND_GRAPH_MAX_AGE = 60 * 60
+
+# Start loading the friend graph when a WSGI/ASGI worker boots. The load scans
+# the whole Friendship table, so enable it only for the pool that serves
+# separation/; elsewhere the graph is loaded on first use
+FRIEND_GRAPH_PRELOAD = False
+
+# Background jobs (connection.jobs): seconds between queue polls when idle,
+# seconds without a heartbeat before a running job is handed to another
+# worker, pause in seconds between chunks to bound database load, runs
+# before a failing job is given up on, and seconds before the first retry
+# (doubled for every further one)
+JOB_POLL_INTERVAL = 5
+JOB_HEARTBEAT_TIMEOUT = 300
+JOB_CHUNK_PAUSE = 0.1
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF = 30
+
+# Shared search results (connection.coalesce): seconds a result page is
+# cached, XFetch early-refresh factor (higher refreshes earlier), and seconds
+# other processes wait on the process computing a missing result
+SEARCH_CACHE_TTL = 5
+COALESCE_BETA = 1.0
+COALESCE_LOCK_TIMEOUT = 2
+
 import os
 
 LOGGING = {
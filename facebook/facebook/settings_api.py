@@ -0,0 +1,44 @@
+"""
+API-only settings for the facebook project.
+
+Worker pools that only serve the `connection` endpoints use this profile
+through `facebook.wsgi_api` / `facebook.asgi_api`. The admin, sessions,
+messages and staticfiles apps are not installed, so there is no admin
+autodiscovery, no session/CSRF/message middleware and no template engine.
+
+This does not keep those modules out of the process entirely: on the first
+request `rest_framework.views` imports `rest_framework.schemas`, which pulls
+in `django.contrib.admindocs`, `django.contrib.admin` and
+`django.contrib.messages`. `manage.py bench_startup` shows the real split
+between startup and first-request cost.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'connection',
+    'rest_framework.authtoken',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'facebook.urls_api'
+
+WSGI_APPLICATION = 'facebook.wsgi_api.application'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    # The browsable API needs the template engine, JSON is all clients use
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
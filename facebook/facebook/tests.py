@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import Client, SimpleTestCase, TestCase
+
+# Runs in a fresh interpreter: the API profile changes INSTALLED_APPS and
+# the DRF renderers, which cannot be swapped inside an already set up process.
+API_PROFILE_PROBE = """
+import json
+
+import django
+from django.test.utils import setup_test_environment
+
+django.setup()
+setup_test_environment()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+
+connection.creation.create_test_db(verbosity=0)
+User.objects.create_user("alice", password="pw", first_name="Alice")
+
+client = Client()
+results = {}
+response = client.post("/api-token-auth/", {"username": "alice", "password": "pw"})
+results["token"] = [response.status_code, response["Content-Type"]]
+headers = {
+    "HTTP_AUTHORIZATION": f"Token {response.json()['token']}",
+    "HTTP_ACCEPT": "text/html,*/*;q=0.8",
+}
+for name, path in [
+    ("friends", "/connection/friends/"),
+    ("search", "/connection/search-users/?search=alice"),
+    ("admin", "/admin/"),
+]:
+    response = client.get(path, **headers)
+    results[name] = [response.status_code, response["Content-Type"]]
+results["search_data"] = client.get(
+    "/connection/search-users/?search=alice", **headers
+).json()["data"]
+print(json.dumps(results))
+"""
+
+
+class ApiProfileTests(SimpleTestCase):
+    def test_api_profile_serves_json_endpoints(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "facebook.settings_api"}
+        output = subprocess.run(
+            [sys.executable, "-c", API_PROFILE_PROBE],
+            cwd=Path(__file__).resolve().parent.parent,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results = json.loads(output.splitlines()[-1])
+
+        for name in ("token", "friends", "search"):
+            # Browsers asking for HTML still get JSON: only JSONRenderer is on
+            self.assertEqual(results[name], [200, "application/json"], name)
+        self.assertEqual(results["search_data"][0]["username"], "alice")
+        # urls_api has no admin site
+        self.assertEqual(results["admin"][0], 404)
+
+
+class StatelessPathMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.alice = User.objects.create_user("alice", password="pw")
+
+    def test_connection_routes_set_no_session_or_csrf_cookie(self):
+        response = self.client.post(
+            "/connection/login/",
+            {"username": "alice", "password": "pw"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["code"], 200)
+        token = response.json()["data"]["token"]
+
+        response = self.client.get(
+            "/connection/friends/", HTTP_AUTHORIZATION=f"Token {token}"
+        )
+        self.assertEqual(response.json()["code"], 200)
+        token_response = self.client.post(
+            "/api-token-auth/", {"username": "alice", "password": "pw"}
+        )
+        for response in (response, token_response):
+            self.assertNotIn("sessionid", response.cookies)
+            self.assertNotIn("csrftoken", response.cookies)
+            self.assertNotIn("Cookie", response.get("Vary", ""))
+            # XFrameOptionsMiddleware runs in SESSION_MIDDLEWARE, so a
+            # missing header means the chain was skipped
+            self.assertNotIn("X-Frame-Options", response)
+
+    def test_admin_keeps_session_and_csrf(self):
+        response = self.client.get("/admin/login/")
+        self.assertIn("csrftoken", response.cookies)
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+
+        admin = User.objects.create_superuser("admin", password="pw")
+        self.client.force_login(admin)
+        response = self.client.post(
+            "/admin/connection/friendship/",
+            {"action": "accept_requests", "_selected_action": []},
+        )
+        self.assertEqual(response.status_code, 403)
@@ -15,7 +15,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
-from rest_framework.authtoken import views
+from connection import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -0,0 +1,12 @@
+"""facebook API-only URL Configuration
+
+Used by `facebook.settings_api`; the same routes as `facebook.urls`
+without the admin site.
+"""
+from django.urls import path,include
+from connection import views
+
+urlpatterns = [
+    path('connection/',include('connection.urls')),
+    path('api-token-auth/', views.obtain_auth_token)
+]
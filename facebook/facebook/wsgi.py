@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'facebook.settings')
 
 application = get_wsgi_application()
+
+# Pools serving degrees-of-separation can build the friend graph at boot
+# rather than on the first request; others never load it
+from django.conf import settings  # noqa: E402
+
+if settings.FRIEND_GRAPH_PRELOAD:
+    from connection.graph import friend_graph
+
+    friend_graph.start()
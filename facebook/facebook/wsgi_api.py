@@ -0,0 +1,26 @@
+"""
+WSGI config for the API-only facebook workers.
+
+It exposes the WSGI callable as a module-level variable named ``application``
+using the trimmed ``facebook.settings_api`` profile.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'facebook.settings_api')
+
+application = get_wsgi_application()
+
+# Pools serving degrees-of-separation can build the friend graph at boot
+# rather than on the first request; others never load it
+from django.conf import settings  # noqa: E402
+
+if settings.FRIEND_GRAPH_PRELOAD:
+    from connection.graph import friend_graph
+
+    friend_graph.start()